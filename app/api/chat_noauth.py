@@ -1,41 +1,58 @@
 """
 OpenRouter proxy endpoint with FSM streaming support and Contract Mode
 """
-import json
 import os
-import uuid
+import asyncio
 import datetime
+from secrets import token_hex
 from typing import Dict, Any, Optional
-from fastapi import APIRouter, Request, HTTPException, Response
+from fastapi import APIRouter, BackgroundTasks, HTTPException, Path, Response
 from fastapi.responses import StreamingResponse
 import httpx
+import orjson
+from app.core.admission import UpstreamAdmission, get_upstream_admission
+from app.core.artifact_store import get_artifact_store
+from app.core.http import get_upstream_client
 from app.core.stream_processor import create_fsm_stream
-from app.core.repair import safe_repair
+from app.core.repair import safe_repair_with_report
 from app.core.fsm import extract_json_from_content
+from app.models.chat import ChatCompletionRequest
 from app.core.schema_validator import (
-    validate_against_schema, 
+    validate_against_schema_obj,
     is_valid_schema,
     generate_schema_description,
     extract_schema_requirements
 )
 
-# Simple in-memory store for repair artifacts (last 100 requests)
-repair_artifacts = {}
-MAX_ARTIFACTS = 100
-
 router = APIRouter()
 
+# Upstream configuration is resolved once at import; `streamfix serve` sets
+# these environment variables before the app module is loaded
+OPENROUTER_API_KEY = os.getenv("OPENROUTER_API_KEY")
+UPSTREAM_BASE_URL = os.getenv("UPSTREAM_BASE_URL", "https://openrouter.ai/api/v1")
+UPSTREAM_URL = f"{UPSTREAM_BASE_URL}/chat/completions"
+UPSTREAM_HEADERS = {
+    "Authorization": f"Bearer {OPENROUTER_API_KEY}",
+    "Content-Type": "application/json",
+    "HTTP-Referer": "http://localhost:8000",
+    "X-Title": "StreamFix Gateway",
+}
+
+# Shape of the ids minted below - anything else is rejected before a store lookup
+REQUEST_ID_PATTERN = r"^req_[0-9a-f]{12}$"
+
+# Content at least this long is repaired on a worker thread instead of the event loop
+REPAIR_OFFLOAD_CHARS = 16_384
+
 
 @router.post("/v1/chat/completions")
-async def chat_completions(request: Request, response: Response):
+async def chat_completions(body: ChatCompletionRequest, response: Response, background_tasks: BackgroundTasks):
     """
     OpenAI-compatible chat completions endpoint
     Proxies to OpenRouter with FSM-based JSON repair
     """
-    body = await request.json()
-    
-    # Extract schema for Contract Mode (optional)
-    schema = body.pop("schema", None)  # Remove from body to avoid sending to upstream
+    # Extract schema for Contract Mode (optional) - excluded from the upstream payload
+    schema = body.response_schema
     schema_description = None
     
     if schema:
@@ -49,98 +66,115 @@ async def chat_completions(request: Request, response: Response):
         schema_description = generate_schema_description(schema)
     
     # Generate request ID for tracking
-    request_id = f"req_{uuid.uuid4().hex[:12]}"
+    request_id = f"req_{token_hex(6)}"
     response.headers["x-streamfix-request-id"] = request_id
     
-    # Use a default OpenRouter key for testing
-    openrouter_key = os.getenv("OPENROUTER_API_KEY")
-    if not openrouter_key:
+    if not OPENROUTER_API_KEY:
         raise HTTPException(status_code=500, detail="OPENROUTER_API_KEY environment variable not set")
     
-    # Get upstream base URL from environment (for testing with mock)
-    upstream_base_url = os.getenv("UPSTREAM_BASE_URL", "https://openrouter.ai/api/v1")
-    upstream_url = f"{upstream_base_url}/chat/completions"
-    
     # Set default model if none provided
-    if "model" not in body or not body["model"]:
-        body["model"] = "anthropic/claude-3.5-sonnet"
+    if not body.model:
+        body.model = "anthropic/claude-3.5-sonnet"
     
     # Determine if streaming
-    stream = body.get("stream", False)
+    stream = bool(body.stream)
+    
+    # Serialize once, straight from the validated model
+    payload = body.model_dump_json(exclude_none=True).encode()
     
     try:
-        async with httpx.AsyncClient(timeout=60.0) as client:
-            if stream:
-                # Streaming response with FSM processing
-                response = await client.post(
-                    upstream_url,
-                    headers={
-                        "Authorization": f"Bearer {openrouter_key}",
-                        "Content-Type": "application/json",
-                        "HTTP-Referer": "http://localhost:8000",
-                        "X-Title": "StreamFix Gateway",
-                    },
-                    json=body,
-                    timeout=None
-                )
+        client = get_upstream_client()
+        if stream:
+            # Streaming response with FSM processing - send without buffering the body
+            upstream_request = client.build_request(
+                "POST",
+                UPSTREAM_URL,
+                headers=UPSTREAM_HEADERS,
+                content=payload
+            )
+            
+            # Hold an upstream slot for the life of the stream - released when the
+            # relay ends, whether it finished, failed or the client went away
+            admission = get_upstream_admission()
+            await admission.acquire()
+            try:
+                upstream_response = await client.send(upstream_request, stream=True)
                 
-                if response.status_code != 200:
+                if upstream_response.status_code != 200:
+                    error_body = await upstream_response.aread()
+                    await upstream_response.aclose()
                     raise HTTPException(
-                        status_code=response.status_code,
-                        detail=f"OpenRouter error: {response.text}"
+                        status_code=upstream_response.status_code,
+                        detail=f"OpenRouter error: {error_body.decode('utf-8', errors='replace')}"
                     )
                 
-                # Use FSM stream processor
-                fsm_stream = await create_fsm_stream(response)
-                
-                return StreamingResponse(
-                    fsm_stream,
-                    media_type="text/event-stream",  # Proper SSE media type
-                    headers={
-                        "Cache-Control": "no-cache",
-                        "Connection": "keep-alive"
-                    }
+                # Use FSM stream processor; bytes are relayed as upstream produces them.
+                # Deltas are only parsed and fed to the FSM for Contract Mode requests
+                fsm_stream = await create_fsm_stream(upstream_response, repair_enabled=schema is not None)
+            except BaseException:
+                await admission.release()
+                raise
+            
+            return StreamingResponse(
+                relay_upstream_stream(fsm_stream, upstream_response, admission),
+                media_type="text/event-stream",  # Proper SSE media type
+                headers={
+                    "Cache-Control": "no-cache",
+                    "Connection": "keep-alive",
+                    "X-Accel-Buffering": "no"  # Stop nginx from coalescing SSE chunks
+                }
+            )
+        else:
+            # Non-streaming response - the shared client leaves reads unbounded
+            # for streams, so this call carries its own 60s limit
+            response = await client.post(
+                UPSTREAM_URL,
+                headers=UPSTREAM_HEADERS,
+                content=payload,
+                timeout=httpx.Timeout(60.0, connect=5.0)
+            )
+            
+            if response.status_code != 200:
+                raise HTTPException(
+                    status_code=response.status_code,
+                    detail=f"OpenRouter error: {response.text}"
                 )
-            else:
-                # Non-streaming response
-                response = await client.post(
-                    upstream_url,
-                    headers={
-                        "Authorization": f"Bearer {openrouter_key}",
-                        "Content-Type": "application/json",
-                        "HTTP-Referer": "http://localhost:8000", 
-                        "X-Title": "StreamFix Gateway",
-                    },
-                    json=body
+            
+            # Get response content and attempt repair
+            response_data = orjson.loads(response.content)
+            original_content = response_data.get("choices", [{}])[0].get("message", {}).get("content", "")
+            model = body.model
+            
+            # Build repair artifact with schema validation - long content would
+            # stall every other request on this worker for the whole repair
+            if original_content and len(original_content) >= REPAIR_OFFLOAD_CHARS:
+                repair_info = await asyncio.to_thread(
+                    build_repair_artifact,
+                    request_id,
+                    original_content,
+                    model,
+                    schema=schema,
+                    schema_description=schema_description
                 )
-                
-                if response.status_code != 200:
-                    raise HTTPException(
-                        status_code=response.status_code,
-                        detail=f"OpenRouter error: {response.text}"
-                    )
-                
-                # Get response content and attempt repair
-                response_data = response.json()
-                original_content = response_data.get("choices", [{}])[0].get("message", {}).get("content", "")
-                model = body.get("model", "unknown")
-                
-                # Store repair artifact with schema validation
-                repair_info = store_repair_artifact(
+            else:
+                repair_info = build_repair_artifact(
                     request_id, 
                     original_content, 
                     model, 
                     schema=schema,
                     schema_description=schema_description
                 )
-                
-                # Return potentially repaired response
-                if repair_info["repaired_content"] != original_content:
-                    response_data["choices"][0]["message"]["content"] = repair_info["repaired_content"]
-                
-                return response_data
-                
-                
+            
+            # Persist after the response is sent - keeps store writes off the critical path
+            background_tasks.add_task(get_artifact_store().put, request_id, repair_info)
+            
+            # Return potentially repaired response
+            if repair_info["repaired_content"] != original_content:
+                response_data["choices"][0]["message"]["content"] = repair_info["repaired_content"]
+            
+            return response_data
+            
+            
     except httpx.RequestError as e:
         raise HTTPException(
             status_code=500,
@@ -148,41 +182,63 @@ async def chat_completions(request: Request, response: Response):
         )
 
 
-def store_repair_artifact(request_id: str, content: str, model: str, schema: Optional[Dict[str, Any]] = None, schema_description: Optional[str] = None, is_retry: bool = False, retry_success: Optional[bool] = None) -> dict:
-    """Store repair artifact with optional schema validation and return repair info"""
-    global repair_artifacts
-    
+async def relay_upstream_stream(fsm_stream, upstream_response: httpx.Response, admission: UpstreamAdmission):
+    """Relay the processed stream; close upstream and free the slot however it ends"""
+    try:
+        async for chunk in fsm_stream:
+            yield chunk
+    finally:
+        await close_upstream_stream(upstream_response, admission)
+
+
+async def close_upstream_stream(upstream_response: httpx.Response, admission: UpstreamAdmission) -> None:
+    """Close a relayed upstream stream and free its admission slot"""
+    try:
+        await upstream_response.aclose()
+    finally:
+        await admission.release()
+
+
+def build_repair_artifact(request_id: str, content: str, model: str, schema: Optional[Dict[str, Any]] = None, schema_description: Optional[str] = None, is_retry: bool = False, retry_success: Optional[bool] = None) -> dict:
+    """Build repair artifact with optional schema validation and return repair info"""
     # Phase 2: Extract JSON first, then validate schema
     try:
-        # Step 1: Extract JSON from mixed content
-        extracted_json, extraction_status = extract_json_from_content(content)
-        
-        # Step 2: Repair the extracted JSON if needed
-        repaired_content = safe_repair(extracted_json) if extracted_json else ""
-        repairs_applied = []
-        parse_success = True
-        
-        # Simple repair detection
-        if extracted_json != repaired_content:
-            if ',' in extracted_json and ',' not in repaired_content.replace(',', ''):
-                repairs_applied.append("remove_trailing_comma")
-            if '{' in extracted_json and '"' not in extracted_json.split(':')[0]:
-                repairs_applied.append("quote_unquoted_keys")
-        
-        # Test if repaired content is valid JSON
+        # Fast path: content is already a JSON document - nothing to extract or repair
         try:
-            if repaired_content.strip():
-                json.loads(repaired_content)
-        except json.JSONDecodeError:
-            parse_success = False
+            parsed = orjson.loads(content) if content else None
+        except orjson.JSONDecodeError:
+            parsed = None
+        
+        if isinstance(parsed, (dict, list)):
+            extracted_json, extraction_status = content, "DONE"
+            repaired_content = content
+            repairs_applied = []
+            parse_success = True
+        else:
+            # Step 1: Extract JSON from mixed content
+            extracted_json, extraction_status = extract_json_from_content(content)
+            
+            # Step 2: Repair the extracted JSON if needed
+            if extracted_json:
+                repaired_content, repairs_applied = safe_repair_with_report(extracted_json)
+            else:
+                repaired_content, repairs_applied = "", []
+            parse_success = True
+            
+            # Test if repaired content is valid JSON - keep the result for schema validation
+            try:
+                if repaired_content.strip():
+                    parsed = orjson.loads(repaired_content)
+            except orjson.JSONDecodeError:
+                parse_success = False
         
         # Step 3: Schema validation on extracted+repaired JSON
         schema_valid = None
         schema_errors = []
         
         if schema and parse_success and repaired_content.strip():
-            # Validate against schema only if we have valid JSON
-            schema_valid, schema_errors = validate_against_schema(repaired_content, schema)
+            # Validate against schema only if we have valid JSON - reuses the parsed value
+            schema_valid, schema_errors = validate_against_schema_obj(parsed, schema)
     except Exception:
         extracted_json = ""
         repaired_content = content
@@ -206,7 +262,7 @@ def store_repair_artifact(request_id: str, content: str, model: str, schema: Opt
     else:
         status = "PASSTHROUGH"
     
-    # Store artifact
+    # Build artifact
     artifact = {
         "request_id": request_id,
         "timestamp": datetime.datetime.utcnow().isoformat(),
@@ -233,39 +289,36 @@ def store_repair_artifact(request_id: str, content: str, model: str, schema: Opt
     else:
         artifact["schema_provided"] = False
     
-    # Keep only last MAX_ARTIFACTS
-    if len(repair_artifacts) >= MAX_ARTIFACTS:
-        oldest_key = min(repair_artifacts.keys(), key=lambda k: repair_artifacts[k]["timestamp"])
-        del repair_artifacts[oldest_key]
-    
-    repair_artifacts[request_id] = artifact
     return artifact
 
 
 @router.get("/result/{request_id}")
-async def get_repair_result(request_id: str):
+async def get_repair_result(request_id: str = Path(pattern=REQUEST_ID_PATTERN)):
     """Get repair artifact for a specific request"""
-    if request_id not in repair_artifacts:
+    artifact = await get_artifact_store().get(request_id)
+    if artifact is None:
         raise HTTPException(status_code=404, detail="Request ID not found")
     
-    return repair_artifacts[request_id]
+    return artifact
 
 
 @router.get("/metrics")
 async def get_metrics():
     """Get basic repair metrics"""
-    if not repair_artifacts:
+    counters = await get_artifact_store().counters()
+    total = counters.get("total", 0)
+    if not total:
         return {"message": "No repair data available"}
     
-    total = len(repair_artifacts)
-    repaired = sum(1 for a in repair_artifacts.values() if a["status"] == "REPAIRED")
-    parse_success = sum(1 for a in repair_artifacts.values() if a["parse_success"])
+    repaired = counters.get("repaired", 0)
+    parse_success = counters.get("parse_success", 0)
     
     # Count repair types
-    repair_types = {}
-    for artifact in repair_artifacts.values():
-        for repair_type in artifact["repairs_applied"]:
-            repair_types[repair_type] = repair_types.get(repair_type, 0) + 1
+    repair_types = {
+        key.split(":", 1)[1]: count
+        for key, count in counters.items()
+        if key.startswith("repair_type:")
+    }
     
     return {
         "total_requests": total,
@@ -273,4 +326,4 @@ async def get_metrics():
         "parse_success_rate": round(parse_success / total, 3) if total > 0 else 0,
         "repair_types": repair_types,
         "last_updated": datetime.datetime.utcnow().isoformat()
-    }
\ No newline at end of file
+    }
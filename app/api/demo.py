@@ -1,7 +1,7 @@
 """
 Demo endpoint showing OpenRouter + FSM integration
 """
-import json
+import orjson
 from typing import Dict, Any
 from fastapi import APIRouter, Request
 from fastapi.responses import StreamingResponse
@@ -9,13 +9,25 @@ from app.core.stream_processor import JSONStreamProcessor
 
 router = APIRouter()
 
+# Simulated OpenAI-style streaming chunks, serialized once as SSE frames
+MOCK_STREAM_FRAMES = tuple(
+    b"data: " + orjson.dumps(chunk) + b"\n\n"
+    for chunk in [
+        {"choices": [{"delta": {"content": "Hello"}}]},
+        {"choices": [{"delta": {"content": " there!"}}]},
+        {"choices": [{"delta": {"content": " Here's some JSON: {\"test\": true"}}]},
+        {"choices": [{"delta": {"content": ", \"broken\": \"value\""}}]},
+        {"choices": [{"delta": {"content": "}"}}]},
+    ]
+) + (b"data: [DONE]\n\n",)
+
 
 @router.post("/v1/demo/fsm")
 async def demo_fsm_processing(request: Request) -> Dict[str, Any]:
     """
     Demo endpoint showing FSM JSON processing
     """
-    body = await request.json()
+    body = orjson.loads(await request.body())
     test_content = body.get("content", "Here's some broken JSON: {\"key\": \"value\"")
     
     # Test FSM processing
@@ -34,26 +46,15 @@ async def demo_streaming(request: Request):
     """
     Demo streaming endpoint with mock SSE data
     """
-    body = await request.json()
+    body = orjson.loads(await request.body())
     
-    # Mock streaming response
+    # Mock streaming response - frames are pre-encoded at import
     async def mock_stream():
-        # Simulate OpenAI-style streaming chunks
-        chunks = [
-            {"choices": [{"delta": {"content": "Hello"}}]},
-            {"choices": [{"delta": {"content": " there!"}}]},
-            {"choices": [{"delta": {"content": " Here's some JSON: {\"test\": true"}}]},
-            {"choices": [{"delta": {"content": ", \"broken\": \"value\""}}]},
-            {"choices": [{"delta": {"content": "}"}}]},
-        ]
-        
-        for chunk in chunks:
-            yield f"data: {json.dumps(chunk)}\\n\\n"
-        
-        yield "data: [DONE]\\n\\n"
+        for frame in MOCK_STREAM_FRAMES:
+            yield frame
     
     return StreamingResponse(
         mock_stream(),
         media_type="text/plain",
-        headers={"Cache-Control": "no-cache"}
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
     )
\ No newline at end of file
@@ -6,7 +6,6 @@ Simple command-line interface for running StreamFix locally
 import os
 import sys
 import argparse
-import uvicorn
 
 
 def main():
@@ -35,6 +34,9 @@ def main():
         print(f"📖 Point your OpenAI client to: http://{args.host}:{args.port}/v1")
         print("Press CTRL+C to stop")
         
+        # Imported here so --help and argument errors don't pay for the server stack
+        import uvicorn
+        
         try:
             uvicorn.run(
                 "app.main:app", 
@@ -1,26 +1,32 @@
 import os
-from decouple import config
+
+
+def _env(name: str, default, cast=str):
+    """Read an environment variable once, falling back to a typed default"""
+    value = os.environ.get(name)
+    return cast(value) if value is not None else default
+
 
 # Database
-DATABASE_URL = config("DATABASE_URL", default="postgresql://localhost/streamfix_dev")
+DATABASE_URL = _env("DATABASE_URL", "postgresql://localhost/streamfix_dev")
 
 # Upstream provider
-UPSTREAM_PROVIDER = config("UPSTREAM_PROVIDER", default="openrouter")
-OPENROUTER_API_KEY = config("OPENROUTER_API_KEY", default="")
-OPENROUTER_BASE_URL = config("OPENROUTER_BASE_URL", default="https://openrouter.ai/api/v1")
+UPSTREAM_PROVIDER = _env("UPSTREAM_PROVIDER", "openrouter")
+OPENROUTER_API_KEY = _env("OPENROUTER_API_KEY", "")
+OPENROUTER_BASE_URL = _env("OPENROUTER_BASE_URL", "https://openrouter.ai/api/v1")
 
 # Security
-STREAMFIX_MASTER_KEY = config("STREAMFIX_MASTER_KEY", default="dev-key-change-in-production")
-STREAMFIX_ADMIN_TOKEN = config("STREAMFIX_ADMIN_TOKEN", default="admin-dev-token")
+STREAMFIX_MASTER_KEY = _env("STREAMFIX_MASTER_KEY", "dev-key-change-in-production")
+STREAMFIX_ADMIN_TOKEN = _env("STREAMFIX_ADMIN_TOKEN", "admin-dev-token")
 
 # App settings
-ENV = config("ENV", default="dev")
-LOG_LEVEL = config("LOG_LEVEL", default="info")
-MAX_JSON_CHARS = config("MAX_JSON_CHARS", default=200000, cast=int)
-MAX_STREAM_SECONDS = config("MAX_STREAM_SECONDS", default=90, cast=int)
-MAX_CONCURRENT_STREAMS = config("MAX_CONCURRENT_STREAMS", default=50, cast=int)
-MAX_RPM = config("MAX_RPM", default=120, cast=int)
-DEFAULT_RULE_PACK = config("DEFAULT_RULE_PACK", default="default")
+ENV = _env("ENV", "dev")
+LOG_LEVEL = _env("LOG_LEVEL", "info")
+MAX_JSON_CHARS = _env("MAX_JSON_CHARS", 200000, cast=int)
+MAX_STREAM_SECONDS = _env("MAX_STREAM_SECONDS", 90, cast=int)
+MAX_CONCURRENT_STREAMS = _env("MAX_CONCURRENT_STREAMS", 50, cast=int)
+MAX_RPM = _env("MAX_RPM", 120, cast=int)
+DEFAULT_RULE_PACK = _env("DEFAULT_RULE_PACK", "default")
 
 # Railway deployment
-PORT = config("PORT", default=8000, cast=int)
\ No newline at end of file
+PORT = _env("PORT", 8000, cast=int)
\ No newline at end of file
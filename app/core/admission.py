@@ -0,0 +1,65 @@
+"""
+Admission control for upstream provider calls
+"""
+import asyncio
+from typing import Optional
+from app.config import MAX_CONCURRENT_STREAMS
+
+
+class UpstreamAdmission:
+    """
+    Caps the number of in-flight upstream requests.
+    A Condition plus a counter rather than a Semaphore, so the cap can be
+    resized at runtime without reaching into the primitive's internals.
+    """
+
+    def __init__(self, limit: int):
+        self._cond = asyncio.Condition()
+        self._active = 0
+        self._limit = limit
+
+    @property
+    def active(self) -> int:
+        return self._active
+
+    @property
+    def limit(self) -> int:
+        return self._limit
+
+    async def acquire(self) -> None:
+        """Wait until a slot is free, then take it"""
+        async with self._cond:
+            await self._cond.wait_for(lambda: self._active < self._limit)
+            self._active += 1
+
+    async def release(self) -> None:
+        """Give a slot back and wake one waiter"""
+        async with self._cond:
+            self._active -= 1
+            self._cond.notify(1)
+
+    async def resize(self, limit: int) -> None:
+        """Change the cap; waiters re-check it (a lower cap lets active requests drain)"""
+        async with self._cond:
+            self._limit = limit
+            self._cond.notify_all()
+
+    async def __aenter__(self) -> "UpstreamAdmission":
+        await self.acquire()
+        return self
+
+    async def __aexit__(self, *exc_info) -> None:
+        await self.release()
+
+
+# Created on first use, inside the running event loop
+_admission: Optional[UpstreamAdmission] = None
+
+
+def get_upstream_admission() -> UpstreamAdmission:
+    """Return the process-wide admission controller"""
+    global _admission
+
+    if _admission is None:
+        _admission = UpstreamAdmission(MAX_CONCURRENT_STREAMS)
+    return _admission
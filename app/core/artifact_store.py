@@ -0,0 +1,115 @@
+"""
+Repair artifact storage
+In-process by default; shared across workers through Redis when REDIS_URL is set
+"""
+import os
+from collections import OrderedDict
+from typing import Dict, Any, Optional
+import orjson
+
+try:
+    import redis.asyncio as aioredis
+except ImportError:  # Optional dependency - only needed for multi-worker deployments
+    aioredis = None
+
+MAX_ARTIFACTS = 100
+ARTIFACT_TTL_SECONDS = 3600
+
+
+def _metrics_delta(artifact: Dict[str, Any]) -> Dict[str, int]:
+    """Counter increments contributed by a single artifact"""
+    delta = {
+        "total": 1,
+        "repaired": 1 if artifact["status"] == "REPAIRED" else 0,
+        "parse_success": 1 if artifact["parse_success"] else 0,
+    }
+    for repair_type in artifact["repairs_applied"]:
+        key = f"repair_type:{repair_type}"
+        delta[key] = delta.get(key, 0) + 1
+    return delta
+
+
+class MemoryArtifactStore:
+    """Per-process store keeping the last MAX_ARTIFACTS artifacts, oldest first"""
+
+    def __init__(self, max_artifacts: int = MAX_ARTIFACTS):
+        self.max_artifacts = max_artifacts
+        self.artifacts: "OrderedDict[str, dict]" = OrderedDict()
+
+    async def put(self, request_id: str, artifact: Dict[str, Any]) -> None:
+        if len(self.artifacts) >= self.max_artifacts:
+            self.artifacts.popitem(last=False)
+        self.artifacts[request_id] = artifact
+
+    async def get(self, request_id: str) -> Optional[Dict[str, Any]]:
+        return self.artifacts.get(request_id)
+
+    async def counters(self) -> Dict[str, int]:
+        """Aggregate counters over the artifacts currently held"""
+        counters: Dict[str, int] = {}
+        for artifact in self.artifacts.values():
+            for key, value in _metrics_delta(artifact).items():
+                counters[key] = counters.get(key, 0) + value
+        return counters
+
+    async def close(self) -> None:
+        pass
+
+
+class RedisArtifactStore:
+    """Redis-backed store: artifacts expire after a TTL, metrics are O(1) counters"""
+
+    ARTIFACT_KEY = "sfx:artifact:{}"
+    METRICS_KEY = "sfx:metrics"
+
+    def __init__(self, url: str, ttl_seconds: int = ARTIFACT_TTL_SECONDS):
+        self.redis = aioredis.from_url(url)
+        self.ttl_seconds = ttl_seconds
+
+    async def put(self, request_id: str, artifact: Dict[str, Any]) -> None:
+        async with self.redis.pipeline(transaction=False) as pipe:
+            pipe.set(self.ARTIFACT_KEY.format(request_id), orjson.dumps(artifact), ex=self.ttl_seconds)
+            for key, value in _metrics_delta(artifact).items():
+                if value:
+                    pipe.hincrby(self.METRICS_KEY, key, value)
+            await pipe.execute()
+
+    async def get(self, request_id: str) -> Optional[Dict[str, Any]]:
+        raw = await self.redis.get(self.ARTIFACT_KEY.format(request_id))
+        if raw is None:
+            return None
+        return orjson.loads(raw)
+
+    async def counters(self) -> Dict[str, int]:
+        raw = await self.redis.hgetall(self.METRICS_KEY)
+        return {key.decode(): int(value) for key, value in raw.items()}
+
+    async def close(self) -> None:
+        await self.redis.aclose()
+
+
+_store = None
+
+
+def get_artifact_store():
+    """Return the process-wide artifact store"""
+    global _store
+
+    if _store is None:
+        redis_url = os.getenv("REDIS_URL")
+        if redis_url:
+            if aioredis is None:
+                raise RuntimeError("REDIS_URL is set but the redis package is not installed")
+            _store = RedisArtifactStore(redis_url)
+        else:
+            _store = MemoryArtifactStore()
+    return _store
+
+
+async def close_artifact_store() -> None:
+    """Release the store's connections (called on application shutdown)"""
+    global _store
+
+    if _store is not None:
+        await _store.close()
+        _store = None
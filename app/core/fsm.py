@@ -1,5 +1,6 @@
+import re
 from dataclasses import dataclass, field
-from typing import List
+from typing import Callable, List, Optional
 
 @dataclass 
 class PreprocessState:
@@ -9,8 +10,10 @@ class PreprocessState:
     fence_lang_captured: bool = False
     carry: str = ""  # Buffer for partial tokens across chunks
     has_fences: bool = False  # Track if we've seen any fences
-    fence_only_content: str = ""  # Content found only inside fences
-    all_content: str = ""  # All content (minus think blocks and fence markers)
+    fence_only_content: List[str] = field(default_factory=list)  # Content found only inside fences
+    all_content: List[str] = field(default_factory=list)  # All content (minus think blocks and fence markers)
+    sink: Optional[Callable[[str, bool], Optional[bool]]] = None  # If set, receives (content, inside_fence) instead of the buffers
+    stopped: bool = False  # Set once the sink returns True - remaining input is ignored
 
 @dataclass
 class JsonFsmState:
@@ -20,87 +23,122 @@ class JsonFsmState:
     in_string: bool = False
     escape: bool = False
     started_with: str = ""  # '{' or '['
-    buf: List[str] = field(default_factory=list)
+    open_stack: List[str] = field(default_factory=list)  # Closers for the brackets still open, innermost last
+    buf: List[str] = field(default_factory=list)  # Pieces (characters or slices) of the JSON text seen so far
+    size: int = 0  # Total characters in buf
     max_chars: int = 200_000
 
 THINK_OPEN = "<think>"
 THINK_CLOSE = "</think>"
 FENCE = "```"
-TAIL = 7  # max(len("</think>"), len("<think>"), len("```")) - 1
-
-def preprocess_chunk(text: str, state: PreprocessState) -> str:
+TAIL = 7  # max(len("</think>"), len("<think>"), len("```")) - 1: longest partial token carried
+_TOKEN_PREFIXES = frozenset(token[:k] for token in (THINK_OPEN, THINK_CLOSE, FENCE) for k in range(1, len(token)))
+_TOKEN_RE = re.compile(r"<think>|</think>|```")
+SCAN_MIN_CHARS = 64  # below this fsm_feed walks characters instead of using the regexes
+_SEEK_RE = {None: re.compile(r"[{\[]"), "object": re.compile(r"\{"), "array": re.compile(r"\[")}
+_STRING_TAIL_RE = re.compile(r'[^"\\]*(?:\\.[^"\\]*)*"', re.DOTALL)  # rest of a string up to its closing quote
+_CLOSERS = {"{": "}", "[": "]"}
+_JSON_TOKEN_RE = re.compile(r'"[^"\\]*(?:\\.[^"\\]*)*"|["{}\[\]]', re.DOTALL)  # complete string, lone quote or bracket
+
+def _scan(text: str, state: PreprocessState, hold_partial: bool = False) -> str:
     """
-    Streaming-safe preprocessing with two-candidate approach.
-    Accumulates both fence-only and all-content streams.
+    Run text through the preprocessor: drop <think> blocks, fence markers and
+    fence language tags. Updates state and returns the emitted content.
+    Tokens are located with one regex search; the text between them is
+    handled as whole slices. With hold_partial, a trailing prefix of a token
+    is kept in state.carry instead of being emitted.
     """
-    buf = (state.carry or "") + (text or "")
-    if not buf:
-        return ""
-
-    # Always keep tail for next chunk, except handle empty tail case
-    if len(buf) <= TAIL:
-        state.carry = buf
-        return ""
+    out = []
+    pos = 0
     
-    cut = len(buf) - TAIL
-    body, tail = buf[:cut], buf[cut:]
-
-    immediate_out = []  # For immediate compatibility
-    i = 0
+    if state.stopped:
+        return ""
     
-    while i < len(body):
+    for match in _TOKEN_RE.finditer(text):
+        _scan_segment(text[pos:match.start()], state, out)
+        if state.stopped:
+            return "".join(out)
+        pos = match.end()
+        token = match.group()
+        
         # Handle <think> blocks
-        if body.startswith(THINK_OPEN, i):
+        if token == THINK_OPEN:
             state.in_think = True
-            i += len(THINK_OPEN)
-            continue
-        
-        if state.in_think and body.startswith(THINK_CLOSE, i):
-            state.in_think = False
-            i += len(THINK_CLOSE)
-            continue
-        
+        elif token == THINK_CLOSE:
+            if state.in_think:
+                state.in_think = False
+            else:
+                # Stray closing tag outside a think block is plain content
+                _scan_segment(token, state, out)
         # Handle ``` fences
-        if body.startswith(FENCE, i):
+        else:
             state.has_fences = True
-            if not state.fence_open:
-                state.fence_open = True
-                state.fence_lang_captured = False
-            else:
-                state.fence_open = False
-                state.fence_lang_captured = False
-            i += len(FENCE)
-            continue
+            state.fence_open = not state.fence_open
+            state.fence_lang_captured = False
+    
+    tail = text[pos:]
+    if hold_partial:
+        keep = _partial_token_len(tail)
+        if keep:
+            state.carry = tail[-keep:]
+            tail = tail[:-keep]
+    
+    _scan_segment(tail, state, out)
+    return "".join(out)
 
-        c = body[i]
 
-        # Skip content inside <think> blocks
-        if state.in_think:
-            i += 1
-            continue
+def _partial_token_len(text: str) -> int:
+    """Length of the longest suffix of text that could be the start of a token"""
+    for k in range(min(len(text), TAIL), 0, -1):
+        if text[-k:] in _TOKEN_PREFIXES:
+            return k
+    return 0
 
-        # Handle fence content - skip language tag line
-        if state.fence_open and not state.fence_lang_captured:
-            if c == "\n":
-                state.fence_lang_captured = True
-            i += 1
-            continue
-            
-        # Accumulate in appropriate streams
-        if state.fence_open:
-            # Inside fences: add to fence-only stream
-            state.fence_only_content += c
-        
-        # Always add to all-content stream
-        state.all_content += c
-        immediate_out.append(c)
-        i += 1
 
-    state.carry = tail
-    return "".join(immediate_out)
+def _scan_segment(segment: str, state: PreprocessState, out: List[str]) -> None:
+    """Emit a token-free slice according to the current think/fence state"""
+    # Skip content inside <think> blocks
+    if not segment or state.in_think:
+        return
+    
+    # Handle fence content - skip language tag line
+    if state.fence_open and not state.fence_lang_captured:
+        newline = segment.find("\n")
+        if newline == -1:
+            return
+        state.fence_lang_captured = True
+        segment = segment[newline + 1:]
+        if not segment:
+            return
+    
+    # Hand content straight to the consumer when one is attached
+    if state.sink is not None:
+        if state.sink(segment, state.fence_open):
+            state.stopped = True
+        return
+    
+    # Accumulate in appropriate streams
+    if state.fence_open:
+        # Inside fences: add to fence-only stream
+        state.fence_only_content.append(segment)
+    
+    # Always add to all-content stream
+    state.all_content.append(segment)
+    out.append(segment)
 
-    state.carry = tail
-    return "".join(out)
+
+def preprocess_chunk(text: str, state: PreprocessState) -> str:
+    """
+    Streaming-safe preprocessing with two-candidate approach.
+    Accumulates both fence-only and all-content streams.
+    """
+    buf = (state.carry or "") + (text or "")
+    if not buf:
+        return ""
+    
+    # Scan everything; only a trailing partial token is carried to the next chunk
+    state.carry = ""
+    return _scan(buf, state, hold_partial=True)
 
 
 def preprocess_finalize(state: PreprocessState) -> str:
@@ -112,63 +150,12 @@ def preprocess_finalize(state: PreprocessState) -> str:
     state.carry = ""
     
     # Process the carry through the same logic
-    processed_tail = ""
-    i = 0
-    while i < len(final_chunk):
-        # Handle <think> blocks
-        if final_chunk.startswith(THINK_OPEN, i):
-            state.in_think = True
-            i += len(THINK_OPEN)
-            continue
-        
-        if state.in_think and final_chunk.startswith(THINK_CLOSE, i):
-            state.in_think = False
-            i += len(THINK_CLOSE)
-            continue
-        
-        # Handle ``` fences
-        if final_chunk.startswith(FENCE, i):
-            state.has_fences = True
-            if not state.fence_open:
-                state.fence_open = True
-                state.fence_lang_captured = False
-            else:
-                state.fence_open = False
-                state.fence_lang_captured = False
-            i += len(FENCE)
-            continue
-
-        c = final_chunk[i]
-
-        # Skip content inside <think> blocks
-        if state.in_think:
-            i += 1
-            continue
-
-        # Handle fence content - skip language tag line
-        if state.fence_open and not state.fence_lang_captured:
-            if c == "\n":
-                state.fence_lang_captured = True
-            i += 1
-            continue
-            
-        # Accumulate in appropriate streams
-        if state.fence_open:
-            state.fence_only_content += c
-        
-        state.all_content += c
-        processed_tail += c
-        i += 1
-
-    return processed_tail
+    return _scan(final_chunk, state)
 
 
 def preprocess_get_result(state: PreprocessState) -> str:
     """Get final result after finalization - make fence decision"""
-    if state.has_fences:
-        return state.fence_only_content
-    else:
-        return state.all_content
+    return "".join(state.fence_only_content if state.has_fences else state.all_content)
 
 
 def preprocess_streaming(chunks: list[str]) -> str:
@@ -184,84 +171,6 @@ def preprocess_streaming(chunks: list[str]) -> str:
     
     # Get final result with fence decision
     return preprocess_get_result(state)
-    state = PreprocessState()
-    
-    for chunk in chunks:
-        preprocess_chunk(chunk, state)
-    
-    # Process final carry
-    preprocess_finalize(state)
-    
-    # Make the fence decision just like preprocess_complete
-    if state.has_seen_fences:
-        return state.accumulated_fence_content
-    else:
-        return state.accumulated_non_fence_content
-    """Process any remaining content in carry buffer and return appropriate result"""
-    # Process any remaining carry
-    if state.carry:
-        final_chunk = state.carry
-        state.carry = ""
-        
-        fence_content = []
-        non_fence_content = []
-        i = 0
-        
-        while i < len(final_chunk):
-            # Handle <think> blocks
-            if final_chunk.startswith(THINK_OPEN, i):
-                state.in_think = True
-                i += len(THINK_OPEN)
-                continue
-            
-            if state.in_think and final_chunk.startswith(THINK_CLOSE, i):
-                state.in_think = False
-                i += len(THINK_CLOSE)
-                continue
-            
-            # Handle ``` fences
-            if final_chunk.startswith(FENCE, i):
-                state.has_seen_fences = True
-                if not state.fence_open:
-                    state.fence_open = True
-                    state.fence_lang_captured = False
-                else:
-                    state.fence_open = False
-                    state.fence_lang_captured = False
-                i += len(FENCE)
-                continue
-
-            c = final_chunk[i]
-
-            # Skip content inside <think> blocks
-            if state.in_think:
-                i += 1
-                continue
-
-            # Handle fence content
-            if state.fence_open:
-                if not state.fence_lang_captured:
-                    if c == "\n":
-                        state.fence_lang_captured = True
-                    i += 1
-                    continue
-                fence_content.append(c)
-                i += 1
-                continue
-
-            # Outside fence and not in think
-            non_fence_content.append(c)
-            i += 1
-
-        # Add final content to accumulated totals
-        state.accumulated_fence_content += "".join(fence_content)
-        state.accumulated_non_fence_content += "".join(non_fence_content)
-
-    # Make global decision: if any fences were seen, return only fence content
-    if state.has_seen_fences:
-        return state.accumulated_fence_content
-    else:
-        return state.accumulated_non_fence_content
 
 
 def preprocess_complete(text: str) -> str:
@@ -271,68 +180,11 @@ def preprocess_complete(text: str) -> str:
     if not text:
         return ""
     
-    out = []
-    fence_out = []  # Collect content inside fences
-    i = 0
-    in_think = False
-    fence_open = False
-    fence_lang_captured = False
-    has_fences = False  # Track if we ever see any fences
+    state = PreprocessState()
+    _scan(text, state)
     
-    while i < len(text):
-        # Handle <think> blocks
-        if text.startswith(THINK_OPEN, i):
-            in_think = True
-            i += len(THINK_OPEN)
-            continue
-        
-        if in_think and text.startswith(THINK_CLOSE, i):
-            in_think = False
-            i += len(THINK_CLOSE)
-            continue
-        
-        # Handle ``` fences
-        if text.startswith(FENCE, i):
-            has_fences = True  # Mark that we found fences
-            # Toggle fence state
-            if not fence_open:
-                fence_open = True
-                fence_lang_captured = False
-            else:
-                fence_open = False
-                fence_lang_captured = False
-            i += len(FENCE)
-            continue
-
-        c = text[i]
-
-        # Skip content inside <think> blocks
-        if in_think:
-            i += 1
-            continue
-
-        # Handle fence content
-        if fence_open:
-            # Skip fence language tag line until newline
-            if not fence_lang_captured:
-                if c == "\n":
-                    fence_lang_captured = True
-                i += 1
-                continue
-            # Inside fenced content - add to fence output
-            fence_out.append(c)
-            i += 1
-            continue
-
-        # Outside fence and not in think: add to general output
-        out.append(c)
-        i += 1
-
     # Return fenced content if any fences were found, otherwise return general content
-    if has_fences:
-        return "".join(fence_out)
-    else:
-        return "".join(out)
+    return preprocess_get_result(state)
 
 
 def fsm_feed(state: JsonFsmState, text: str, root: str = None) -> None:
@@ -343,6 +195,15 @@ def fsm_feed(state: JsonFsmState, text: str, root: str = None) -> None:
     if state.state in ("DONE", "FAILED"):
         return
     
+    # Longer text goes through the regex scanner; streamed deltas are usually
+    # a few characters, where walking them directly is cheaper
+    if len(text) >= SCAN_MIN_CHARS:
+        _feed_scan(state, text, root)
+        return
+    
+    buf = state.buf
+    base = len(buf) - state.size  # len(buf) - base == characters buffered
+    
     for ch in text:
         if state.state == "SEEK_START":
             if root == "object" and ch != "{":
@@ -353,13 +214,12 @@ def fsm_feed(state: JsonFsmState, text: str, root: str = None) -> None:
                 state.state = "IN_JSON"
                 state.started_with = ch
                 state.depth = 1
-                state.buf.append(ch)
-            else:
-                continue
+                state.open_stack.append(_CLOSERS[ch])
+                buf.append(ch)
             continue
         
         # IN_JSON state
-        state.buf.append(ch)
+        buf.append(ch)
         
         if state.in_string:
             if state.escape:
@@ -379,15 +239,105 @@ def fsm_feed(state: JsonFsmState, text: str, root: str = None) -> None:
         
         if ch in "{[":
             state.depth += 1
+            state.open_stack.append(_CLOSERS[ch])
         elif ch in "}]":
             state.depth -= 1
+            if state.open_stack and state.open_stack[-1] == ch:
+                state.open_stack.pop()
             if state.depth == 0:
                 state.state = "DONE"
-                return
+                break
         
-        if len(state.buf) >= state.max_chars:
+        if len(buf) - base >= state.max_chars:
             state.state = "FAILED"
-            return
+            break
+    
+    state.size = len(buf) - base
+
+
+def _feed_scan(state: JsonFsmState, text: str, root: str = None) -> None:
+    """Regex-driven FSM step for longer text"""
+    # JSON text is buffered as one slice per call rather than one str per character;
+    # the regexes jump over whole strings and plain runs instead of visiting each character
+    start = 0
+    i = 0
+    n = len(text)
+    
+    while i < n:
+        if state.state == "SEEK_START":
+            match = _SEEK_RE.get(root, _SEEK_RE[None]).search(text, i)
+            if match is None:
+                return
+            start = match.start()
+            state.state = "IN_JSON"
+            state.started_with = text[start]
+            state.depth = 1
+            state.open_stack.append(_CLOSERS[text[start]])
+            i = start + 1
+            continue
+        
+        # IN_JSON state
+        if state.in_string:
+            if state.escape:
+                state.escape = False
+                i += 1
+                continue
+            match = _STRING_TAIL_RE.match(text, i)
+            if match:
+                state.in_string = False
+                i = match.end()
+                continue
+            # String runs past this chunk - only a dangling backslash carries over
+            backslashes = min(n - len(text.rstrip("\\")), n - i)
+            state.escape = backslashes % 2 == 1
+            break
+        
+        # not in string - everything between tokens is plain
+        for match in _JSON_TOKEN_RE.finditer(text, i):
+            j = match.start()
+            if j > i and state.size + (j - start) >= state.max_chars:
+                state.state = "FAILED"
+                return
+            
+            ch = text[j]
+            i = match.end()
+            if ch == '"':
+                if i - j == 1:
+                    # Unterminated string - continue it above
+                    state.in_string = True
+                    break
+                continue
+            
+            if ch in "{[":
+                state.depth += 1
+                state.open_stack.append(_CLOSERS[ch])
+            else:
+                state.depth -= 1
+                if state.open_stack and state.open_stack[-1] == ch:
+                    state.open_stack.pop()
+                if state.depth == 0:
+                    state.state = "DONE"
+                    _buffer(state, text[start:i])
+                    return
+            
+            if state.size + (i - start) >= state.max_chars:
+                state.state = "FAILED"
+                return
+        else:
+            if n > i and state.size + (n - start) >= state.max_chars:
+                state.state = "FAILED"
+                return
+            break
+    
+    if state.state == "IN_JSON":
+        _buffer(state, text[start:])
+
+
+def _buffer(state: JsonFsmState, piece: str) -> None:
+    """Append a slice of JSON text to the FSM buffer"""
+    if piece:
+        state.buf.append(piece)
+        state.size += len(piece)
 
 
 def fsm_finalize(state: JsonFsmState) -> None:
@@ -423,16 +373,27 @@ def extract_json_from_content(content: str) -> tuple[str, str]:
     if not content:
         return "", "FAILED"
     
+    # Single pass: the preprocessor feeds both fence candidates to their own FSM
+    # as it goes, so the cleaned text is never materialized
+    fence_fsm = JsonFsmState()
+    all_fsm = JsonFsmState()
+    
+    def feed(segment: str, inside_fence: bool) -> bool:
+        if inside_fence:
+            fsm_feed(fence_fsm, segment)
+        fsm_feed(all_fsm, segment)
+        # Once both candidates are settled nothing later can change the result
+        # (a settled fence candidate means fences were seen) - stop scanning
+        return fence_fsm.state in ("DONE", "FAILED") and all_fsm.state in ("DONE", "FAILED")
+    
     # Step 1: Preprocess to remove think blocks and handle fences
-    preprocess_state = PreprocessState()
+    preprocess_state = PreprocessState(sink=feed)
     preprocess_chunk(content, preprocess_state)
     preprocess_finalize(preprocess_state)
-    clean_content = preprocess_get_result(preprocess_state)
     
-    # Step 2: Run FSM extraction on cleaned content
-    fsm_state = JsonFsmState()
-    fsm_feed(fsm_state, clean_content)
+    # Step 2: Same fence decision as preprocess_get_result
+    fsm_state = fence_fsm if preprocess_state.has_fences else all_fsm
     fsm_finalize(fsm_state)
     
     # Step 3: Get final result
-    return fsm_result(fsm_state)
\ No newline at end of file
+    return fsm_result(fsm_state)
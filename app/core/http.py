@@ -0,0 +1,41 @@
+"""
+Shared HTTP client for upstream provider calls
+"""
+from typing import Optional
+import httpx
+
+# One pooled client per process: keep-alive + HTTP/2 multiplexing across requests
+_upstream_client: Optional[httpx.AsyncClient] = None
+
+
+def get_upstream_client() -> httpx.AsyncClient:
+    """Return the process-wide upstream client, creating it on first use"""
+    global _upstream_client
+
+    if _upstream_client is None or _upstream_client.is_closed:
+        _upstream_client = httpx.AsyncClient(
+            http2=True,
+            # Idle connections are kept for 30s (httpx defaults to 5s) so bursts reuse them
+            limits=httpx.Limits(max_connections=1000, max_keepalive_connections=100, keepalive_expiry=30.0),
+            # Fail fast on an unreachable upstream; reads stay unbounded for long streams
+            timeout=httpx.Timeout(60.0, connect=5.0, read=None),
+        )
+    return _upstream_client
+
+
+async def warm_upstream_client(url: str) -> None:
+    """Open a pooled connection (TCP + TLS) to the upstream before the first request needs it"""
+    try:
+        await get_upstream_client().head(url)
+    except httpx.HTTPError:
+        # Best effort - the first real request simply connects itself
+        pass
+
+
+async def close_upstream_client() -> None:
+    """Close the shared client (called on application shutdown)"""
+    global _upstream_client
+
+    if _upstream_client is not None:
+        await _upstream_client.aclose()
+        _upstream_client = None
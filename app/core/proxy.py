@@ -7,15 +7,17 @@ from typing import Dict, Any, Optional, AsyncGenerator
 from app.models.database import Project, UpstreamCredential
 from app.core.crypto import decrypt_api_key
 from sqlalchemy.orm import Session
+from app.core.http import get_upstream_client
 
 
 class UpstreamProvider:
     """Base class for upstream provider clients"""
     
-    def __init__(self, base_url: str, api_key: str):
+    def __init__(self, base_url: str, api_key: str, client: Optional[httpx.AsyncClient] = None):
         self.base_url = base_url
         self.api_key = api_key
-        self.client = httpx.AsyncClient(timeout=90.0)
+        # Pooled process-wide client - providers own no connections of their own
+        self.client = client or get_upstream_client()
     
     def get_headers(self) -> Dict[str, str]:
         """Get headers for upstream requests"""
@@ -51,14 +53,14 @@ class UpstreamProvider:
         """Streaming completion"""
         body["stream"] = True
         
+        # SSE is forwarded as received: ask for an unencoded body so the raw
+        # network chunks can be relayed without a decode step
+        headers = {**headers, "Accept-Encoding": "identity"}
+        
         async with self.client.stream("POST", url, json=body, headers=headers) as response:
             response.raise_for_status()
-            async for chunk in response.aiter_bytes():
+            async for chunk in response.aiter_raw():
                 yield chunk
-    
-    async def close(self):
-        """Close the HTTP client"""
-        await self.client.aclose()
 
 
 class OpenRouterProvider(UpstreamProvider):
@@ -81,6 +83,7 @@ class OpenAIProvider(UpstreamProvider):
 def get_provider_client(project: Project, db: Session) -> UpstreamProvider:
     """
     Get the appropriate provider client for a project
+    Providers share the pooled upstream client - there is nothing to close per request
     """
     # Get upstream credentials
     credential = db.query(UpstreamCredential).filter(
@@ -1,33 +1,62 @@
 import re
 import json
+import orjson
 from app.core.fsm import JsonFsmState
 
+# Patterns are compiled once at import rather than looked up in re's cache per call
+_UNQUOTED_KEY_RE = re.compile(r'([{\s,]\s*)([a-zA-Z_][a-zA-Z0-9_]*)(\s*:)')
+_INNER_QUOTES_KV_RE = re.compile(r'"[^"]*":\s*"[^"]*"[^"]*"[^"]*"')
+_TRAILING_COMMA_RE = re.compile(r",\s*([}\]])")
+# Truncated tail, in priority order: a partial keyword to complete, an incomplete
+# "key": value pair (with the comma before it) to drop, or a dangling comma to drop
+_TRUNCATED_TAIL_RE = re.compile(
+    r'\b(?P<keyword>tru|fals|nul)$'
+    r'|(?:,\s*)?"\w+":\s*(?!(?:tru|fals|nul)$)[a-zA-Z]+$'
+    r'|,\s*$'
+)
+_KEYWORD_COMPLETIONS = {"tru": "true", "fals": "false", "nul": "null"}
+_STRING_LITERAL_RE = re.compile(r'"[^"\\]*(?:\\.[^"\\]*)*"?', re.DOTALL)
+_BRACKET_RE = re.compile(r'[{}\[\]]')
+_SQ_ESCAPE_RE = re.compile(r'\\.|"', re.DOTALL)
+# Double-quoted strings are kept as-is, single-quoted ones converted, stray quotes flipped
+_QUOTED_RE = re.compile(r'("[^"\\]*(?:\\.[^"\\]*)*"?)|\'([^\'\\]*(?:\\.[^\'\\]*)*)\'|\'', re.DOTALL)
+
 def fix_unquoted_keys(json_text: str) -> str:
     """Fix unquoted property names: {name: "value"} → {"name": "value"}"""
     # Use regex to find unquoted keys followed by colon
     # Pattern: word at start of line/after brace/comma, followed by colon
-    
-    def quote_key(match):
-        before = match.group(1)  # whitespace/brace/comma before
-        key = match.group(2)     # the unquoted key
-        after = match.group(3)   # whitespace and colon after
-        return f'{before}"{key}"{after}'
-    
-    # Match: (whitespace/brace/comma)(word)(whitespace:)
-    pattern = r'([{\s,]\s*)([a-zA-Z_][a-zA-Z0-9_]*)(\s*:)'
-    return re.sub(pattern, quote_key, json_text)
+    # Match: (whitespace/brace/comma)(word)(whitespace:) -> quote the word
+    return _UNQUOTED_KEY_RE.sub(r'\1"\2"\3', json_text)
 
 def fix_quote_types(json_text: str) -> str:
     """Fix single quotes to double quotes: {'key': 'value'} → {"key": "value"}"""
-    # Simple replacement - just swap all single quotes with double quotes
-    # This works for most cases where single quotes are used consistently
-    return json_text.replace("'", '"')
+    # Single pass over the quoted spans: apostrophes inside double-quoted
+    # strings are left alone, double quotes inside single-quoted ones escaped
+    if "'" not in json_text:
+        return json_text
+    return _QUOTED_RE.sub(_convert_quoted, json_text)
+
+def _convert_quoted(match) -> str:
+    """Rewrite one _QUOTED_RE match with double quotes"""
+    if match.group(1) is not None:
+        return match.group(1)
+    if match.group(2) is None:
+        return '"'
+    return '"' + _SQ_ESCAPE_RE.sub(_convert_sq_escape, match.group(2)) + '"'
+
+def _convert_sq_escape(match) -> str:
+    """\\' is not a JSON escape and a bare " would end the converted string"""
+    token = match.group(0)
+    if token == "\\'":
+        return "'"
+    if token == '"':
+        return '\\"'
+    return token
 
 def fix_unescaped_quotes(json_text: str) -> str:
     """Try to fix unescaped quotes in string values"""
     # First, check if it already parses - if so, don't touch it
     try:
-        import json
         json.loads(json_text)
         return json_text
     except:
@@ -35,7 +64,6 @@ def fix_unescaped_quotes(json_text: str) -> str:
     
     # Look for key-value pairs where the value contains unescaped quotes
     # Pattern: "key": "value with "quotes" inside"
-    pattern = r'"[^"]*":\s*"[^"]*"[^"]*"[^"]*"'
     
     def fix_kv_pair(match):
         kv_pair = match.group(0)
@@ -48,16 +76,18 @@ def fix_unescaped_quotes(json_text: str) -> str:
         value_part = kv_pair[colon_pos+1:].strip()
         
         # Fix the value part if it has the quote pattern
-        if value_part.startswith('"') and value_part.endswith('"') and value_part.count('"') > 2:
+        if value_part.startswith('"') and value_part.endswith('"'):
             inner = value_part[1:-1]  # Remove outer quotes
-            # Escape any unescaped quotes in the inner content
-            inner_fixed = inner.replace('"', '\\"')
-            value_fixed = f'"{inner_fixed}"'
-            return key_part + ' ' + value_fixed
+            # Any quote between the outer ones - the search stops at the first
+            if '"' in inner:
+                # Escape any unescaped quotes in the inner content
+                inner_fixed = inner.replace('"', '\\"')
+                value_fixed = f'"{inner_fixed}"'
+                return key_part + ' ' + value_fixed
         
         return kv_pair
     
-    result = re.sub(pattern, fix_kv_pair, json_text)
+    result = _INNER_QUOTES_KV_RE.sub(fix_kv_pair, json_text)
     
     # Test if our fix worked
     if result != json_text:
@@ -80,78 +110,101 @@ def safe_repair(json_text: str, state: JsonFsmState = None) -> str:
     - close missing brackets for truncated JSON
     - handle incomplete values
     """
+    return safe_repair_with_report(json_text, state)[0]
+
+
+def safe_repair_with_report(json_text: str, state: JsonFsmState = None) -> tuple[str, list[str]]:
+    """
+    Same repairs as safe_repair.
+    Returns (repaired_text, names of the repairs that changed the text)
+    """
+    repairs_applied = []
     if not json_text:
-        return json_text
+        return json_text, repairs_applied
+    
+    # Well-formed JSON needs no repair - and the regex passes below would
+    # corrupt string values that contain quotes or "word:" sequences
+    try:
+        orjson.loads(json_text)
+        return json_text, repairs_applied
+    except orjson.JSONDecodeError:
+        pass
+    
+    # Each pass is skipped when the text lacks the character its pattern needs
     
     # 1. Fix unquoted property names: {name: "value"} → {"name": "value"}
     # Match word characters followed by colon (but not inside strings)
-    json_text = fix_unquoted_keys(json_text)
+    repaired = fix_unquoted_keys(json_text) if ":" in json_text else json_text
+    if repaired != json_text:
+        repairs_applied.append("quote_unquoted_keys")
+        json_text = repaired
     
     # 2. Fix single quotes to double quotes: {'key': 'value'} → {"key": "value"}
-    json_text = fix_quote_types(json_text)
+    repaired = fix_quote_types(json_text)
+    if repaired != json_text:
+        repairs_applied.append("fix_quote_types")
+        json_text = repaired
     
     # 3. Try to fix unescaped quotes in string values
-    json_text = fix_unescaped_quotes(json_text)
+    repaired = fix_unescaped_quotes(json_text) if ":" in json_text else json_text
+    if repaired != json_text:
+        repairs_applied.append("escape_inner_quotes")
+        json_text = repaired
     
     # 4. Remove trailing commas: { "a": 1, } or [1,2,]
-    json_text = re.sub(r",\s*([}\]])", r"\1", json_text)
+    repaired = _TRAILING_COMMA_RE.sub(r"\1", json_text) if "," in json_text else json_text
+    if repaired != json_text:
+        repairs_applied.append("remove_trailing_comma")
+        json_text = repaired
     
     # 5. Handle truncated JSON if state is provided
     if state and state.state != "DONE" and state.depth > 0:
+        # The tail edits are collected and applied in one join at the end:
+        # text is kept up to `end`, then closing quote, completion, rest, closers
+        end = len(json_text)
+        closing_quote = completion = rest = ""
+        
         # Handle incomplete string values by closing quotes
         if state.in_string and not json_text.endswith('"'):
-            json_text += '"'
-        
-        # Handle incomplete boolean/null values at the end
-        # Look for partial keywords and complete them
-        if re.search(r'\b(tru)$', json_text):
-            json_text = re.sub(r'\b(tru)$', 'true', json_text)
-        elif re.search(r'\b(fals)$', json_text):
-            json_text = re.sub(r'\b(fals)$', 'false', json_text)
-        elif re.search(r'\b(nul)$', json_text):
-            json_text = re.sub(r'\b(nul)$', 'null', json_text)
+            closing_quote = '"'
         else:
-            # Handle incomplete values - remove key:value pairs where value is incomplete
-            # Pattern: "key": partial_value (where partial_value is not a complete JSON value)
-            json_text = re.sub(r'"\w+":\s*[a-zA-Z]+$', '', json_text)
-            json_text = re.sub(r',\s*$', '', json_text)  # Remove trailing comma after removal
+            # Handle incomplete values at the end in one search: complete a partial
+            # boolean/null, or remove a "key": partial_value pair or dangling comma
+            # (none can match right after a closing quote)
+            tail = _TRUNCATED_TAIL_RE.search(json_text)
+            if tail:
+                keyword = tail.group("keyword")
+                completion = _KEYWORD_COMPLETIONS[keyword] if keyword else ""
+                end, rest = tail.start(), json_text[tail.end():]
         
         # Count what actually needs closing and close in correct order
         # We need to close structures in LIFO order (last opened first)
         
-        # Build a stack of what's open by scanning the string
-        stack = []
-        i = 0
-        in_string = False
-        escape = False
-        
-        while i < len(json_text):
-            char = json_text[i]
+        # The FSM tracked what's open while it was fed; none of the tail edits
+        # above touch brackets, so its stack holds unless an earlier pass rewrote the text
+        if state.state == "IN_JSON" and not repairs_applied:
+            stack = state.open_stack
+        else:
+            # Rebuild the stack: drop string literals (an unterminated
+            # one runs to the end), then walk only the brackets that remain
+            stack = []
+            structure = _STRING_LITERAL_RE.sub('', json_text[:end])
             
-            if in_string:
-                if escape:
-                    escape = False
-                elif char == '\\':
-                    escape = True
-                elif char == '"':
-                    in_string = False
-            else:
-                if char == '"':
-                    in_string = True
-                elif char == '{':
+            for char in _BRACKET_RE.findall(structure):
+                if char == '{':
                     stack.append('}')
                 elif char == '[':
                     stack.append(']')
-                elif char in '}]':
-                    if stack and stack[-1] == char:
-                        stack.pop()
-            
-            i += 1
+                elif stack and stack[-1] == char:
+                    stack.pop()
         
         # Close everything still on the stack
-        json_text += ''.join(reversed(stack))
+        closers = ''.join(reversed(stack))
+        if closing_quote or completion or closers or end < len(json_text):
+            json_text = ''.join((json_text[:end], closing_quote, completion, rest, closers))
+            repairs_applied.append("close_truncated")
     
-    return json_text
+    return json_text, repairs_applied
 
 
 def attempt_json_parse(json_text: str) -> tuple[bool, dict, str]:
@@ -160,9 +213,9 @@ def attempt_json_parse(json_text: str) -> tuple[bool, dict, str]:
     Returns (success, parsed_obj_or_empty, error_msg)
     """
     try:
-        obj = json.loads(json_text)
+        obj = orjson.loads(json_text)
         return True, obj, ""
-    except json.JSONDecodeError as e:
+    except orjson.JSONDecodeError as e:
         return False, {}, str(e)
     except Exception as e:
         return False, {}, str(e)
\ No newline at end of file
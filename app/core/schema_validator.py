@@ -2,10 +2,128 @@
 JSON Schema validation for Contract Mode
 Provides schema validation functionality for guaranteed JSON structure
 """
-import json
+from functools import lru_cache
 import jsonschema
+import orjson
 from typing import Dict, Any, Tuple, Optional, List
 
+try:
+    import fastjsonschema
+except ImportError:  # Optional dependency - jsonschema alone is used without it
+    fastjsonschema = None
+
+# Distinct schemas kept compiled; Contract Mode clients usually reuse a few
+VALIDATOR_CACHE_SIZE = 256
+
+# Keywords whose meaning is the same in fastjsonschema's draft 7 and in the
+# draft jsonschema picks for the schema, so the two always agree on validity.
+# $ref, tuple-style items, multipleOf (float rounding) and the 2019+/2020
+# vocabulary are left to jsonschema; enum/const only with string/null values
+_FAST_SUBSCHEMA_KEYWORDS = frozenset({
+    "items", "additionalProperties", "not", "if", "then", "else", "contains", "propertyNames",
+})
+_FAST_SUBSCHEMA_MAP_KEYWORDS = frozenset({"properties", "patternProperties"})
+_FAST_SUBSCHEMA_LIST_KEYWORDS = frozenset({"allOf", "anyOf", "oneOf"})
+_FAST_VALUE_KEYWORDS = frozenset({
+    "type", "required", "minLength", "maxLength", "pattern", "minItems", "maxItems",
+    "uniqueItems", "minProperties", "maxProperties", "format",
+    "title", "description", "default", "examples", "$comment",
+})
+# fastjsonschema applies numeric bounds to booleans - only safe when "type" rules them out
+_FAST_NUMERIC_KEYWORDS = frozenset({"minimum", "maximum", "exclusiveMinimum", "exclusiveMaximum"})
+
+
+def _fast_compatible(schema) -> bool:
+    """Whether fastjsonschema gives the same answer as jsonschema for this schema"""
+    if isinstance(schema, bool):
+        return True
+    if not isinstance(schema, dict):
+        return False
+    
+    for keyword, value in schema.items():
+        if keyword in _FAST_VALUE_KEYWORDS:
+            continue
+        if keyword in _FAST_NUMERIC_KEYWORDS:
+            if schema.get("type") not in ("number", "integer"):
+                return False
+        elif keyword in ("enum", "const"):
+            values = value if keyword == "enum" and isinstance(value, list) else [value]
+            if not all(v is None or isinstance(v, str) for v in values):
+                return False
+        elif keyword in _FAST_SUBSCHEMA_KEYWORDS:
+            if not _fast_compatible(value):
+                return False
+        elif keyword in _FAST_SUBSCHEMA_MAP_KEYWORDS:
+            if not isinstance(value, dict) or not all(_fast_compatible(v) for v in value.values()):
+                return False
+        elif keyword in _FAST_SUBSCHEMA_LIST_KEYWORDS:
+            if not isinstance(value, list) or not all(_fast_compatible(v) for v in value):
+                return False
+        else:
+            return False
+    return True
+
+
+@lru_cache(maxsize=VALIDATOR_CACHE_SIZE)
+def _cached_validator(schema_key: bytes):
+    """Checked validator for a canonical (sorted-key) schema encoding"""
+    return _build_validator(orjson.loads(schema_key))
+
+
+@lru_cache(maxsize=VALIDATOR_CACHE_SIZE)
+def _cached_fast_validator(schema_key: bytes):
+    """Generated fastjsonschema validator, or None when the schema isn't eligible"""
+    schema = orjson.loads(schema_key)
+    if not _fast_compatible(schema):
+        return None
+    try:
+        # Formats are not asserted by jsonschema without a format checker either;
+        # defaults stay annotations - filling them in would mutate the caller's data
+        return fastjsonschema.compile(schema, use_formats=False, use_default=False)
+    except Exception:
+        # Definition errors, or generated code it can't build for an unusual schema
+        return None
+
+
+def _build_validator(schema: Dict[str, Any]):
+    """Same steps as jsonschema.validate: pick the draft, check the schema, build"""
+    cls = jsonschema.validators.validator_for(schema)
+    cls.check_schema(schema)
+    return cls(schema)
+
+
+def _schema_key(schema: Dict[str, Any]) -> Optional[bytes]:
+    """Canonical encoding used as the cache key, None if not JSON-encodable"""
+    try:
+        return orjson.dumps(schema, option=orjson.OPT_SORT_KEYS)
+    except TypeError:
+        return None
+
+
+def get_validator(schema: Dict[str, Any]):
+    """
+    Return a validator for schema, reused across calls with an equal schema
+    Raises jsonschema.SchemaError for invalid schemas (never cached)
+    """
+    schema_key = _schema_key(schema)
+    if schema_key is None:
+        # Not JSON-encodable (e.g. non-string keys) - validate without caching
+        return _build_validator(schema)
+    return _cached_validator(schema_key)
+
+
+def get_fast_validator(schema: Dict[str, Any]):
+    """
+    Return a generated fastjsonschema validator for schema, or None when
+    fastjsonschema is not installed or the schema uses keywords it may judge differently
+    """
+    if fastjsonschema is None:
+        return None
+    schema_key = _schema_key(schema)
+    if schema_key is None:
+        return None
+    return _cached_fast_validator(schema_key)
+
 
 def validate_against_schema(json_data: str, schema: Dict[str, Any]) -> Tuple[bool, List[str]]:
     """
@@ -20,13 +138,41 @@ def validate_against_schema(json_data: str, schema: Dict[str, Any]) -> Tuple[boo
     """
     try:
         # First check if JSON is parseable
-        parsed_data = json.loads(json_data)
-    except json.JSONDecodeError as e:
+        parsed_data = orjson.loads(json_data)
+    except orjson.JSONDecodeError as e:
         return False, [f"Invalid JSON syntax: {str(e)}"]
     
+    return validate_against_schema_obj(parsed_data, schema)
+
+
+def validate_against_schema_obj(parsed_data: Any, schema: Dict[str, Any]) -> Tuple[bool, List[str]]:
+    """
+    Validate already-parsed JSON data against provided JSON schema
+    
+    Args:
+        parsed_data: Deserialized JSON value
+        schema: JSON schema dictionary
+        
+    Returns:
+        Tuple of (is_valid, error_messages)
+    """
     try:
-        # Validate against schema
-        jsonschema.validate(parsed_data, schema)
+        # Validate against schema - the compiled validator is cached per schema
+        validator = get_validator(schema)
+        
+        # Generated validator answers the common valid case; failures are
+        # re-run through jsonschema for its error messages
+        fast_validate = get_fast_validator(schema)
+        if fast_validate is not None:
+            try:
+                fast_validate(parsed_data)
+                return True, []
+            except fastjsonschema.JsonSchemaValueException:
+                pass
+        
+        error = jsonschema.exceptions.best_match(validator.iter_errors(parsed_data))
+        if error is not None:
+            raise error
         return True, []
     except jsonschema.ValidationError as e:
         # Extract meaningful error message
@@ -64,6 +210,19 @@ def extract_schema_requirements(schema: Dict[str, Any]) -> str:
     Returns:
         Human-readable description of schema requirements
     """
+    schema_key = _schema_key(schema)
+    if schema_key is None:
+        return _extract_schema_requirements(schema)
+    return _cached_schema_requirements(schema_key)
+
+
+@lru_cache(maxsize=VALIDATOR_CACHE_SIZE)
+def _cached_schema_requirements(schema_key: bytes) -> str:
+    """Requirements text for a canonical schema encoding - built once per schema"""
+    return _extract_schema_requirements(orjson.loads(schema_key))
+
+
+def _extract_schema_requirements(schema: Dict[str, Any]) -> str:
     requirements = []
     
     if schema.get("type") == "object":
@@ -105,6 +264,19 @@ def generate_schema_description(schema: Dict[str, Any]) -> str:
     Returns:
         Brief description of the schema
     """
+    schema_key = _schema_key(schema)
+    if schema_key is None:
+        return _generate_schema_description(schema)
+    return _cached_schema_description(schema_key)
+
+
+@lru_cache(maxsize=VALIDATOR_CACHE_SIZE)
+def _cached_schema_description(schema_key: bytes) -> str:
+    """Description for a canonical schema encoding - built once per schema"""
+    return _generate_schema_description(orjson.loads(schema_key))
+
+
+def _generate_schema_description(schema: Dict[str, Any]) -> str:
     schema_type = schema.get("type", "unknown")
     
     if schema_type == "object":
@@ -1,31 +1,40 @@
 """
 Streaming JSON processor using FSM for real-time repair
 """
-import json
 import asyncio
+import orjson
 from typing import AsyncGenerator, Dict, Any
-from app.core.fsm import PreprocessState, JsonFsmState, preprocess_chunk, preprocess_finalize, preprocess_get_result, fsm_feed, fsm_result
+from app.core.fsm import PreprocessState, JsonFsmState, preprocess_chunk, preprocess_finalize, preprocess_get_result, fsm_feed, fsm_finalize, fsm_result
+from app.core.repair import safe_repair, attempt_json_parse
+
+# StreamFixer feeds buffered content deltas to the processor once this many characters are pending
+FEED_BATCH_CHARS = 4096
 
 
 class JSONStreamProcessor:
     """Wrapper class for the FSM-based JSON processing"""
     
+    __slots__ = ("preprocess_state", "fsm_state", "_chunks")
+    
     def __init__(self):
         self.preprocess_state = PreprocessState()
         self.fsm_state = JsonFsmState()
-        self.accumulated_content = ""
+        self._chunks = []  # Joined on demand - appending to a str copies it every chunk
+    
+    @property
+    def accumulated_content(self) -> str:
+        """Everything the preprocessor has emitted so far"""
+        return "".join(self._chunks)
     
     def process_chunk(self, chunk: str) -> str:
         """Process a single chunk and return the processed version"""
         # Preprocess to remove <think> blocks and handle fencing
         processed_chunk = preprocess_chunk(chunk, self.preprocess_state)
         
-        # Feed processed chunk to FSM
+        # Feed processed chunk to FSM and accumulate for potential JSON repair
         if processed_chunk:
             fsm_feed(self.fsm_state, processed_chunk)
-        
-        # Accumulate for potential JSON repair
-        self.accumulated_content += processed_chunk
+            self._chunks.append(processed_chunk)
         
         # For now, just return the preprocessed chunk
         # Full JSON repair happens at the end
@@ -39,9 +48,6 @@ class JSONStreamProcessor:
     
     def finalize_extraction(self) -> dict:
         """Finalize both preprocessing and extraction"""
-        from app.core.fsm import fsm_finalize, fsm_feed, fsm_result
-        from app.core.repair import safe_repair, attempt_json_parse
-        
         # 1) Feed preprocessor tail to FSM
         tail = preprocess_finalize(self.preprocess_state)
         if tail:
@@ -73,6 +79,14 @@ class JSONStreamProcessor:
     
     def process_complete(self, complete_text: str) -> str:
         """Process complete text and return repaired version"""
+        # Fast path: already a JSON object/array - the FSM would extract
+        # exactly this text, so skip building and running it
+        try:
+            if isinstance(orjson.loads(complete_text), (dict, list)):
+                return complete_text.strip()
+        except orjson.JSONDecodeError:
+            pass
+        
         # Create fresh states for complete processing
         preprocess_state = PreprocessState()
         fsm_state = JsonFsmState()
@@ -86,10 +100,10 @@ class JSONStreamProcessor:
         
         if status == "DONE" and json_text:
             try:
-                # Validate it's proper JSON
-                parsed = json.loads(json_text)
+                # Validate it's proper JSON - the value itself isn't needed
+                orjson.loads(json_text)
                 return json_text
-            except json.JSONDecodeError:
+            except orjson.JSONDecodeError:
                 pass
         
         # Return original if no valid JSON found
@@ -102,60 +116,85 @@ from typing import Optional
 class StreamFixer:
     """Processes streaming chat completions with passthrough + retrieve pattern"""
     
-    def __init__(self):
+    __slots__ = ("processor", "content_chunks", "pending_chars", "repair_enabled")
+    
+    def __init__(self, repair_enabled: bool = True):
         self.processor = JSONStreamProcessor()
-        self.content_chunks = []  # Track content for repair
+        self.content_chunks = []  # Deltas not yet fed to the processor
+        self.pending_chars = 0
+        self.repair_enabled = repair_enabled
+    
+    def flush(self) -> None:
+        """Feed the pending deltas to the processor as one chunk"""
+        if self.content_chunks:
+            self.processor.process_chunk("".join(self.content_chunks))
+            self.content_chunks.clear()
+            self.pending_chars = 0
     
-    async def process_stream(self, upstream_stream: AsyncGenerator[str, None]) -> AsyncGenerator[str, None]:
+    async def process_stream(self, upstream_stream: AsyncGenerator[bytes, None]) -> AsyncGenerator[bytes, None]:
         """Process streaming with transparent JSON repair"""        
+        if not self.repair_enabled:
+            # Pure relay - nothing will read the FSM, so skip parsing entirely
+            async for chunk in upstream_stream:
+                yield chunk
+            return
+        
         async for chunk in upstream_stream:
-            # Always yield chunks immediately (true streaming)
+            # Always yield upstream bytes immediately and unchanged (true streaming)
             yield chunk
             
-            if not chunk.strip():
-                continue
-                
-            # Parse SSE format for content extraction
-            if chunk.startswith("data: "):
-                data_part = chunk[6:].strip()
+            # A chunk holds one or more complete SSE lines
+            for line in chunk.splitlines():
+                # Parse SSE format for content extraction - only the data payload is decoded
+                if not line.startswith(b"data: "):
+                    continue
                 
-                if data_part == "[DONE]":
+                data_part = line[6:].strip()
+                if data_part == b"[DONE]":
                     continue
                 
                 try:
-                    chunk_data = json.loads(data_part)
+                    chunk_data = orjson.loads(data_part)
                     
                     # Extract content delta for processing
                     choices = chunk_data.get("choices", [])
                     if choices and "delta" in choices[0]:
                         delta = choices[0]["delta"]
-                        if "content" in delta:
-                            content_delta = delta["content"]
-                            # Process chunk for potential repair
-                            self.processor.process_chunk(content_delta)
+                        content_delta = delta.get("content")
+                        if content_delta and isinstance(content_delta, str):
+                            # Deltas are often a single token - batch them so the
+                            # processor runs on longer text far less often
+                            self.content_chunks.append(content_delta)
+                            self.pending_chars += len(content_delta)
+                            if self.pending_chars >= FEED_BATCH_CHARS:
+                                self.flush()
                     
-                except json.JSONDecodeError:
-                    # Ignore malformed chunks
+                except ValueError:
+                    # Ignore malformed chunks (bad JSON or invalid UTF-8)
                     pass
+        
+        # Stream ended - whatever is still pending goes in now
+        self.flush()
 
-async def create_fsm_stream(upstream_response) -> AsyncGenerator[str, None]:
+async def create_fsm_stream(upstream_response, repair_enabled: bool = True) -> AsyncGenerator[bytes, None]:
     """Create FSM-processed stream from upstream response, return (stream, request_id)"""
-    fixer = StreamFixer()
+    fixer = StreamFixer(repair_enabled)
     
     async def upstream_generator():
-        # Use aiter_bytes() with proper line splitting to preserve SSE format
-        buffer = ""
+        # Relay everything up to the last newline of each upstream read as one
+        # chunk - one send per read instead of per line, SSE blank lines kept intact
+        # A bytearray extends in place, so a line spanning many reads isn't re-copied per read
+        buffer = bytearray()
         async for chunk_bytes in upstream_response.aiter_bytes():
             if chunk_bytes:
-                buffer += chunk_bytes.decode('utf-8', errors='ignore')
-                # Split on newlines and yield complete lines
-                while '\n' in buffer:
-                    line, buffer = buffer.split('\n', 1)
-                    if line.strip():  # Only yield non-empty lines
-                        yield line + '\n'
+                buffer += chunk_bytes
+                cut = buffer.rfind(b'\n') + 1
+                if cut:
+                    yield bytes(buffer[:cut])
+                    del buffer[:cut]
         
         # Yield any remaining buffer content
-        if buffer.strip():
-            yield buffer
+        if buffer:
+            yield bytes(buffer)
     
     return fixer.process_stream(upstream_generator())
\ No newline at end of file
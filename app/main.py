@@ -2,9 +2,26 @@
 StreamFix Gateway - Minimal JSON Repair Proxy
 """
 import os
+import asyncio
+from contextlib import asynccontextmanager
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import ORJSONResponse
 from app.api import chat_noauth, health, demo
+from app.core.artifact_store import close_artifact_store
+from app.core.http import close_upstream_client, warm_upstream_client
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    """Application startup/shutdown hooks"""
+    # Warm the upstream connection in the background - startup doesn't wait on it
+    warmup = asyncio.create_task(warm_upstream_client(chat_noauth.UPSTREAM_BASE_URL))
+    yield
+    warmup.cancel()
+    await close_upstream_client()
+    await close_artifact_store()
+
 
 # Create FastAPI app
 app = FastAPI(
@@ -13,6 +30,8 @@ app = FastAPI(
     version="1.0.0",
     docs_url="/docs" if os.getenv("ENVIRONMENT") != "production" else None,
     redoc_url="/redoc" if os.getenv("ENVIRONMENT") != "production" else None,
+    lifespan=lifespan,
+    default_response_class=ORJSONResponse,
 )
 
 # CORS middleware
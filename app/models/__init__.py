@@ -0,0 +1,2 @@
+# Request models
+__all__ = ["chat"]
\ No newline at end of file
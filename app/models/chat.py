@@ -0,0 +1,17 @@
+"""
+Request models for the OpenAI-compatible chat endpoint
+"""
+from typing import Any, Dict, List, Optional
+from pydantic import BaseModel, ConfigDict, Field
+
+
+class ChatCompletionRequest(BaseModel):
+    """OpenAI chat completion request - unknown fields are passed through to upstream"""
+    model_config = ConfigDict(extra="allow", populate_by_name=True)
+
+    model: Optional[str] = None
+    messages: List[Dict[str, Any]]
+    stream: Optional[bool] = None
+
+    # Contract Mode schema - consumed by StreamFix, never sent upstream
+    response_schema: Optional[Dict[str, Any]] = Field(default=None, alias="schema", exclude=True)
@@ -11,9 +11,10 @@ setup(
     packages=find_packages(),
     install_requires=[
         "fastapi>=0.104.0",
-        "uvicorn>=0.24.0",
-        "httpx>=0.25.0",
+        "uvicorn[standard]>=0.24.0",
+        "httpx[http2]>=0.25.0",
         "jsonschema>=4.19.0",
+        "orjson>=3.9.0",
     ],
     entry_points={
         "console_scripts": [
@@ -1,7 +1,7 @@
 import pytest
 from pathlib import Path
 from app.core.fsm import PreprocessState, JsonFsmState, preprocess_chunk, preprocess_complete, preprocess_finalize, preprocess_get_result, preprocess_streaming, fsm_feed, fsm_result, fsm_finalize
-from app.core.repair import safe_repair, attempt_json_parse
+from app.core.repair import safe_repair, safe_repair_with_report, attempt_json_parse
 
 # Path to test fixtures
 FIXTURES_DIR = Path(__file__).parent / "fixtures"
@@ -269,6 +269,14 @@ class TestPreprocessor:
         assert streaming_result == complete_result
         # Content should be extracted when fence is valid
         assert '{"boundary": "test7"}' in streaming_result
+    
+    def test_every_split_point(self):
+        """Streaming matches one-shot preprocessing wherever the text is split"""
+        content = '<think>plan</think>Result:\n```json\n{"a": 1}\n```\ndone'
+        expected = preprocess_complete(content)
+        
+        for i in range(len(content) + 1):
+            assert preprocess_streaming([content[:i], content[i:]]) == expected, f"split at {i}"
 
 
 class TestFSM:
@@ -380,6 +388,19 @@ class TestFSM:
         # Should capture what was received
         assert "incomplete" in result
     
+    def test_open_stack_tracking(self):
+        """Test the FSM keeps the closers for still-open brackets, short and long feeds alike"""
+        content = '{"a": [1, {"b": "x]}"}, [2' + ' ' * 80
+        
+        char_state = JsonFsmState()
+        for ch in content:
+            fsm_feed(char_state, ch)
+        
+        scan_state = JsonFsmState()
+        fsm_feed(scan_state, content)
+        
+        assert char_state.open_stack == scan_state.open_stack == ["}", "]", "]"]
+    
     def test_streaming_simulation(self):
         """Test FSM with simulated streaming chunks"""
         content = load_fixture("04_nested.txt")
@@ -463,6 +484,30 @@ class TestRepair:
         success, obj, error = attempt_json_parse(repaired)
         assert success, f"Parse failed: {error}"
         assert "incomplete" in obj
+    
+    def test_repair_report(self):
+        """Test that only the repairs that changed the text are reported"""
+        repaired, repairs = safe_repair_with_report('{name: "Ann", "tags": [1, 2,],}')
+        
+        success, obj, error = attempt_json_parse(repaired)
+        assert success, f"Parse failed: {error}"
+        assert repairs == ["quote_unquoted_keys", "remove_trailing_comma"]
+        
+        # Valid JSON goes through untouched
+        assert safe_repair_with_report('{"a": [1, 2]}') == ('{"a": [1, 2]}', [])
+        
+        # Including string values the regex repairs would otherwise rewrite
+        valid = '{"msg": "it\'s a note: ok"}'
+        assert safe_repair_with_report(valid) == (valid, [])
+    
+    def test_quote_types_keep_apostrophes(self):
+        """Test that single quotes inside double-quoted strings survive quote repair"""
+        repaired, repairs = safe_repair_with_report("{'msg': \"it's\", 'quote': 'say \"hi\"',}")
+        
+        success, obj, error = attempt_json_parse(repaired)
+        assert success, f"Parse failed: {error}"
+        assert obj == {"msg": "it's", "quote": 'say "hi"'}
+        assert repairs == ["fix_quote_types", "remove_trailing_comma"]
 
 
 class TestEndToEnd:
@@ -497,6 +542,25 @@ class TestEndToEnd:
         assert len(obj["languages"]) == 3
         assert obj["languages"][0]["name"] == "Python"
     
+    def test_extract_json_from_content(self):
+        """Test single-pass extraction matches preprocess-then-FSM"""
+        from app.core.fsm import extract_json_from_content
+        for name in ["08_deepseek_reasoning.txt", "09_trailing_commas.txt", "03_truncated.txt"]:
+            content = load_fixture(name)
+            
+            preprocess_state = PreprocessState()
+            preprocess_chunk(content, preprocess_state)
+            preprocess_finalize(preprocess_state)
+            fsm_state = JsonFsmState()
+            fsm_feed(fsm_state, preprocess_get_result(preprocess_state))
+            fsm_finalize(fsm_state)
+            
+            assert extract_json_from_content(content) == fsm_result(fsm_state), name
+        
+        # Prose JSON before a fence loses to the fenced candidate
+        content = 'Draft: {"draft": true}\n```json\n{"a": [1, 2]}\n```'
+        assert extract_json_from_content(content) == ('{"a": [1, 2]}', "DONE")
+    
     def test_fenced_with_trailing_commas(self):
         """Test pipeline with fenced JSON that has trailing commas"""
         content = """```json
@@ -623,6 +687,66 @@ class TestStreamProcessorIntegration:
         assert final_result["obj"]["status"] == "success"
         assert final_result["obj"]["data"] == [1, 2, 3]
     
+    def test_stream_fixer_batches_deltas(self):
+        """Test batched SSE deltas reach the processor intact and bytes pass through unchanged"""
+        import asyncio
+        import json
+        from app.core.stream_processor import StreamFixer
+        
+        deltas = ["Sure:\n```json\n", '{"a": ', "1, ", None, '"b": [2, 3]}', "\n```"]
+        frames = [
+            f"data: {json.dumps({'choices': [{'delta': {'content': d}}]})}\n\n".encode()
+            for d in deltas
+        ] + [b"data: [DONE]\n\n"]
+        
+        async def upstream():
+            for frame in frames:
+                yield frame
+        
+        async def relay(fixer):
+            return [chunk async for chunk in fixer.process_stream(upstream())]
+        
+        fixer = StreamFixer()
+        assert asyncio.run(relay(fixer)) == frames
+        
+        result = fixer.processor.finalize_extraction()
+        assert result["parse_ok"]
+        assert result["obj"] == {"a": 1, "b": [2, 3]}
+        
+        # Without repair the stream is relayed and nothing is parsed
+        passthrough = StreamFixer(repair_enabled=False)
+        assert asyncio.run(relay(passthrough)) == frames
+        assert passthrough.processor.accumulated_content == ""
+    
+    def test_failed_upstream_stream_releases_admission(self, monkeypatch):
+        """Test an upstream stream that fails mid-way still frees its admission slot"""
+        import httpx
+        from fastapi.testclient import TestClient
+        from app.api import chat_noauth
+        from app.core import admission, http
+        from app.main import app
+        
+        async def failing_body():
+            yield b'data: {"choices": [{"delta": {"content": "{"}}]}\n\n'
+            raise httpx.ReadError("upstream went away")
+        
+        def handler(request):
+            return httpx.Response(200, content=failing_body(), headers={"content-type": "text/event-stream"})
+        
+        monkeypatch.setattr(chat_noauth, "OPENROUTER_API_KEY", "test-key")
+        monkeypatch.setattr(http, "_upstream_client", httpx.AsyncClient(transport=httpx.MockTransport(handler)))
+        monkeypatch.setattr(admission, "_admission", None)
+        
+        client = TestClient(app)
+        with pytest.raises(httpx.ReadError):
+            client.post("/v1/chat/completions", json={
+                "model": "m",
+                "stream": True,
+                "messages": [{"role": "user", "content": "x"}]
+            })
+        
+        assert admission.get_upstream_admission().active == 0
+        
     def test_markdown_wrapper_extraction(self):
         """Test extraction from markdown headers and bullet lists"""
         content = """# Analysis Results
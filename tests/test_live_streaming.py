@@ -5,7 +5,7 @@ Tests actual Server-Sent Events protocol implementation
 """
 import asyncio
 import httpx
-import json
+import orjson
 import time
 from typing import AsyncGenerator
 
@@ -17,22 +17,30 @@ class SSEClient:
     @staticmethod
     async def parse_sse_stream(response: httpx.Response) -> AsyncGenerator[dict, None]:
         """Parse Server-Sent Events from response stream"""
-        async for chunk in response.aiter_text():
-            # Split by data: lines
-            lines = chunk.split("data: ")
+        # Events are delimited on bytes - an event split across reads stays
+        # buffered until its blank line arrives, and only payloads are decoded
+        buffer = bytearray()
+        async for chunk in response.aiter_bytes():
+            buffer += chunk
             
-            for line in lines[1:]:  # Skip first empty split
-                # Clean the line
-                data_content = line.split("\n")[0].strip()
-                
-                if data_content == "[DONE]":
-                    return
+            while (end := buffer.find(b"\n\n")) != -1:
+                event = bytes(buffer[:end])
+                del buffer[:end + 2]
                 
-                if data_content and data_content != ": OPENROUTER PROCESSING":
-                    try:
-                        yield json.loads(data_content)
-                    except json.JSONDecodeError:
-                        print(f"⚠️  Invalid JSON in SSE: {data_content[:100]}...")
+                for line in event.splitlines():
+                    # Comment lines such as ": OPENROUTER PROCESSING" carry no data
+                    if not line.startswith(b"data: "):
+                        continue
+                    
+                    data_content = line[6:].strip()
+                    if data_content == b"[DONE]":
+                        return
+                    
+                    if data_content:
+                        try:
+                            yield orjson.loads(data_content)
+                        except orjson.JSONDecodeError:
+                            print(f"⚠️  Invalid JSON in SSE: {data_content[:100].decode('utf-8', 'replace')}...")
 
 async def test_basic_streaming():
     """Test basic SSE streaming functionality"""
@@ -5,6 +5,9 @@ import pytest
 import json
 from app.core.schema_validator import (
     validate_against_schema,
+    validate_against_schema_obj,
+    get_validator,
+    get_fast_validator,
     is_valid_schema,
     extract_schema_requirements,
     generate_schema_description,
@@ -87,6 +90,40 @@ class TestSchemaValidation:
         
         assert is_valid is False
         assert len(errors) == 1
+    
+    def test_validator_reused_for_equal_schemas(self):
+        """Test equal schemas share one compiled validator regardless of key order"""
+        schema = EXAMPLE_SCHEMAS["person"]
+        reordered = dict(reversed(list(json.loads(json.dumps(schema)).items())))
+        
+        assert get_validator(schema) is get_validator(reordered)
+        
+        is_valid, errors = validate_against_schema('{"name": "John"}', reordered)
+        assert is_valid is False
+        assert "age" in errors[0]
+    
+    def test_fast_validator_skips_divergent_schemas(self):
+        """Test schemas fastjsonschema may judge differently stay on jsonschema"""
+        assert get_fast_validator({"$ref": "#/definitions/a", "definitions": {"a": {}}}) is None
+        assert get_fast_validator({"minimum": 1}) is None  # would also reject booleans
+        assert get_fast_validator({"enum": [1, True]}) is None  # 1 == True in Python
+        
+        # Either way the verdict comes from the same rules
+        is_valid, errors = validate_against_schema('true', {"minimum": 1})
+        assert is_valid is True
+    
+    def test_validation_leaves_data_unchanged(self):
+        """Test schema defaults are not written into the validated object"""
+        schema = {
+            "type": "object",
+            "properties": {"name": {"type": "string"}, "tier": {"type": "string", "default": "free"}}
+        }
+        data = {"name": "x"}
+        
+        is_valid, errors = validate_against_schema_obj(data, schema)
+        
+        assert is_valid is True
+        assert data == {"name": "x"}
 
 
 class TestSchemaUtilities: